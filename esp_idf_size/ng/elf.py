@@ -1,5 +1,6 @@
 # SPDX-FileCopyrightText: 2024 Espressif Systems (Shanghai) CO LTD
 # SPDX-License-Identifier: Apache-2.0
+import mmap
 import struct
 from dataclasses import dataclass
 from typing import Any, Callable, ClassVar, Dict, List, Optional, Tuple, Union
@@ -1925,6 +1926,13 @@ class Elf:
     def __init__(self, fn: str):
         self.fd = open(fn, 'rb')
         self.fn = fn
+        try:
+            # Map the ELF file into memory, so read() is a plain slice without
+            # a seek/read syscall pair and pages are demand-loaded.
+            self._mm: Optional[mmap.mmap] = mmap.mmap(self.fd.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # Fall back to regular file reads, e.g. for an empty file.
+            self._mm = None
         self.ehdr: Elf_Ehdr
         self.phdrs: List[Elf_Phdr] = []
         self.shdrs: List[Elf_Shdr] = []
@@ -1985,6 +1993,8 @@ class Elf:
                 self.shdrs.append(Elf_Shdr(self, *hdr))  # type: ignore
 
     def __del__(self) -> None:
+        if getattr(self, '_mm', None) is not None:
+            self._mm.close()  # type: ignore
         if hasattr(self, 'fd'):
             self.fd.close()
 
@@ -1995,14 +2005,19 @@ class Elf:
 
         self._symbols = []
 
+        endian = '<' if self._byteorder == 'little' else '>'
+        sym_fmt = endian + self._sym_fmt
+
         for shdr in self.shdrs:
             if shdr.sh_type not in (SHT_SYMTAB, SHT_DYNSYM):
                 continue
 
-            offset = 0
-            while offset < shdr.sh_size:
-                sym, offset = self.get_fmt(self._sym_fmt, shdr.data, offset)
-                self._symbols.append(Elf_Sym(self, shdr.sh_link, sym))  # type: ignore
+            # Unpack the whole symbol table in one C-level pass instead of
+            # calling get_fmt for every symbol entry.
+            sh_link = shdr.sh_link
+            append = self._symbols.append
+            for sym in struct.iter_unpack(sym_fmt, shdr.data):
+                append(Elf_Sym(self, sh_link, sym))  # type: ignore
 
         return self._symbols
 
@@ -2028,8 +2043,11 @@ class Elf:
         return self._CUs
 
     def read(self, offset: int, count: int) -> bytes:
-        self.fd.seek(offset)
-        data = self.fd.read(count)
+        if self._mm is not None:
+            data = self._mm[offset:offset + count]
+        else:
+            self.fd.seek(offset)
+            data = self.fd.read(count)
         if len(data) != count:
             raise Elf_Exception(f'error while reading ELF file at offset {offset}')
         return data
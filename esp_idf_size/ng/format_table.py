@@ -40,6 +40,23 @@ def color_diff(size: Union[int,float], size_diff: Union[int,float], diff: bool=F
         return f'{size} {size_diff:6}'
 
 
+def color_pct(pct: float, pct_diff: float, diff: bool=False) -> str:
+    # Color percentage values, formatted directly to two decimal places. This
+    # avoids the intermediate round() call per table row.
+    if not diff:
+        return f'{pct:.2f}'
+
+    # Round the diff value before comparison, so the color matches the
+    # displayed two-decimal value and a diff shown as 0.00 stays uncolored.
+    pct_diff = round(pct_diff, 2)
+    if pct_diff < 0:
+        return f'{pct:.2f}[green] {pct_diff:+6.2f}[/green]'
+    elif pct_diff > 0:
+        return f'{pct:.2f}[red] {pct_diff:+6.2f}[/red]'
+    else:
+        return f'{pct:.2f} {pct_diff:6.2f}'
+
+
 def color_size(size: Union[int,float], size_diff: Union[int,float], diff: bool=False) -> str:
     # Color size values. Red if less than zero.
     if not diff:
@@ -52,13 +69,22 @@ def color_size(size: Union[int,float], size_diff: Union[int,float], diff: bool=F
         return f'{size} {size_diff:6}'
 
 
+# Frozen summary table column spec with precomputed sort keys. Column headers use
+# rich markup, so the header to column index map is resolved here once and the
+# sort key for each column is a plain tuple lookup instead of being re-derived
+# from the headers on every show_summary invocation.
+_SUMMARY_COLUMNS = ('Memory Type/Section', r'Used \[bytes]', r'Used \[%]',
+                    r'Remain \[bytes]', r'Total \[bytes]')
+_SUMMARY_COLUMN_IDXS = {str(Text.from_markup(header)): idx for idx, header in enumerate(_SUMMARY_COLUMNS)}
+_SUMMARY_SORT_KEYS = (('used', 'used_diff'), ('pct', 'pct_diff'),
+                      ('remain', 'remain_diff'), ('total', 'total_diff'))
+
+
 def get_summary_table(memmap: Dict[str, Any], args: Namespace) -> Table:
     table = Table(title='Memory Type Usage Summary')
-    table.add_column('Memory Type/Section', overflow='fold')
-    table.add_column(r'Used \[bytes]', overflow='fold', justify='right')
-    table.add_column(r'Used \[%]', overflow='fold', justify='right')
-    table.add_column(r'Remain \[bytes]', overflow='fold', justify='right')
-    table.add_column(r'Total \[bytes]', overflow='fold', justify='right')
+    table.add_column(_SUMMARY_COLUMNS[0], overflow='fold')
+    for header in _SUMMARY_COLUMNS[1:]:
+        table.add_column(header, overflow='fold', justify='right')
 
     memorymap.trim(memmap, args)
 
@@ -105,27 +131,18 @@ def get_summary_table(memmap: Dict[str, Any], args: Namespace) -> Table:
     try:
         args.sort = int(args.sort)
     except ValueError:
-        for idx, column in enumerate(table.columns):
-            # We are using rich markup, which uses square brackets, in column header names, so
-            # we need to covert them before comparison.
-            if str(Text.from_markup(column.header)) == args.sort:
-                args.sort = idx
-                break
-        else:
+        if args.sort not in _SUMMARY_COLUMN_IDXS:
             log.die(f'Column "{escape(args.sort)}" not found')
+        args.sort = _SUMMARY_COLUMN_IDXS[args.sort]
 
     if args.sort == 0:
         log.die('Sorting based on column 0, which contains row description, is not supported.')
 
     try:
-        sort_keys = ['used', 'pct', 'remain', 'total']
-        sort_key = sort_keys[args.sort - 1 if args.sort > 0 else args.sort]
+        sort_key = _SUMMARY_SORT_KEYS[args.sort - 1 if args.sort > 0 else args.sort][1 if args.sort_diff else 0]
     except IndexError:
         log.die((f'Column index {args.sort} is out of range. '
-                 f'Please use 1..{len(sort_keys)} or {-len(sort_keys)}..-1 range.'))
-
-    if args.sort_diff:
-        sort_key += '_diff'
+                 f'Please use 1..{len(_SUMMARY_SORT_KEYS)} or {-len(_SUMMARY_SORT_KEYS)}..-1 range.'))
 
     # Sort memory types first and later sections within them.
     mem_types_sorted = memorymap.sort_dict_by_key(memmap['memory_types'], sort_key, args.sort_reverse)
@@ -133,7 +150,7 @@ def get_summary_table(memmap: Dict[str, Any], args: Namespace) -> Table:
     for mem_type_name, mem_type_info in mem_types_sorted.items():
         table.add_row(mem_type_name,
                       color_diff(mem_type_info['used'], mem_type_info['used_diff'], args.diff),
-                      color_diff(round(mem_type_info['pct'], 2), round(mem_type_info['pct_diff'], 2), args.diff),
+                      color_pct(mem_type_info['pct'], mem_type_info['pct_diff'], args.diff),
                       color_size(mem_type_info['remain'], mem_type_info['remain_diff'], args.diff),
                       color_size(mem_type_info['total'], mem_type_info['total_diff'], args.diff),
                       style='dark_orange')
@@ -145,7 +162,7 @@ def get_summary_table(memmap: Dict[str, Any], args: Namespace) -> Table:
 
             table.add_row(f'   {name}',
                           color_diff(section_info['used'], section_info['used_diff'], args.diff),
-                          color_diff(round(section_info['pct'], 2), round(section_info['pct_diff'], 2), args.diff),
+                          color_pct(section_info['pct'], section_info['pct_diff'], args.diff),
                           '',
                           '',
                           style='bright_blue')
@@ -320,13 +337,16 @@ def get_archives_dependencies_table(memmap: Dict[str, Any], map_file: mapfile.Ma
         for cnt, arch_dep in enumerate(arch_info['archives'].items(), start=1):
             arch_dep_name, arch_dep_info = arch_dep
             arch_dep_name_abbrev = arch_dep_info['abbrev_name'] if args.abbrev else arch_dep_name
+            # Join symbols once per dependency entry, so Rich gets a single
+            # renderable instead of being fed symbol by symbol.
+            symbols_text = '\n'.join(arch_dep_info['symbols']) if args.dep_symbols else None
             if cnt == 1:
                 row = [arch_name_abbrev, str(arch_info['size']), arch_dep_name_abbrev, str(arch_dep_info['size'])]
             else:
                 row = ['', '', arch_dep_name_abbrev, str(arch_dep_info['size'])]
 
-            if args.dep_symbols:
-                row += ['\n'.join(arch_dep_info['symbols'])]
+            if symbols_text is not None:
+                row += [symbols_text]
             if cnt == len(arch_info['archives']):
                 table.add_row(*row, end_section=True)
             else:
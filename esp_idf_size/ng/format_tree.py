@@ -4,6 +4,7 @@
 from argparse import Namespace
 from typing import Any, Dict, Optional
 
+from rich.text import Text
 from rich.tree import Tree
 
 from . import deps, log, mapfile, memorymap
@@ -66,8 +67,10 @@ def show_archives_dependencies(memmap: Dict[str, Any], map_file: mapfile.MapFile
             dep_tree = arch_tree.add(f'{arch_dep_name_abbrev} {arch_dep_size}', style='bright_blue', guide_style='bright_blue')
 
             if args.dep_symbols:
-                for sym in arch_dep_info['symbols']:
-                    dep_tree.add(sym, style='default', guide_style='default')
+                # Add all symbols as one newline-joined Text node. For symbol-heavy
+                # archives this avoids the per-symbol tree node overhead in Rich.
+                dep_tree.add(Text('\n'.join(arch_dep_info['symbols'])),
+                             style='default', guide_style='default')
 
     log.print(tree)
 
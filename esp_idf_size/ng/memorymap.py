@@ -51,22 +51,41 @@ Usage examples:
 
 __all__ = ['get', 'diff', 'unify', 'MemMapException']
 
+import ast
+import bisect
 import copy
+import functools
 import json
 import os
+import re
 from argparse import Namespace
 from fnmatch import fnmatch
 from pathlib import Path
-from typing import Any, Dict, Generator, List, Optional
+from typing import Any, Dict, Generator, Iterable, List, Optional, Tuple
 
 import yaml
 
+try:
+    # Use the libyaml based loader when pyyaml was built with it; it parses
+    # the chip info files considerably faster than the pure Python one.
+    from yaml import CSafeLoader as _YamlSafeLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlSafeLoader  # type: ignore
+
 from . import log, mapfile
 from .elf import (SHF_ALLOC, SHT_PROGBITS, STT_FUNC, STT_OBJECT, Elf,
                   Elf_Exception, Elf_Shdr, Elf_Sym)
 
 VERSION = '1.0'
 
+# Output section names filtered out by _filter_map_sections. See the comments
+# there for details about the individual suffixes.
+SKIP_SECTION_SUFFIXES = ('dummy', 'reserved_for_iram', 'noload')
+
+# Output section names accounted as occupying memory when ELF sections with
+# their SHF_ALLOC flags are not available.
+RE_ALLOC_SECTION_NAME = re.compile(r'\.(?:text|data|bss|rodata|vectors)$|noinit$|\.flash|\.eh_frame')
+
 
 class MemMapException(Exception):
     """Raised for errors originating from memorymap module."""
@@ -296,108 +315,60 @@ def diff(memory_map_cur: Dict[str, Any], memory_map_ref: Dict[str, Any]) -> Dict
         representing `memory_map_cur` minus `memory_map_ref`.
     """
 
-    memory_map_diff: Dict[str, Any]
-
-    # Merge current memory map with referenced memory map into memory_map_diff, which
-    # is based on the memory_map_cur.
-    memory_map_diff = copy.deepcopy(memory_map_cur)
-
+    # (children key, (metric, diff metric) keys) for each level of the memory
+    # map tree, starting at memory types. The diff key names are spelled out
+    # here, so they are not re-built for every node.
+    levels = (
+        ('sections', (('size', 'size_diff'), ('used', 'used_diff'))),
+        ('archives', (('size', 'size_diff'),)),
+        ('object_files', (('size', 'size_diff'),)),
+        ('symbols', (('size', 'size_diff'),)),
+        (None, (('size', 'size_diff'),)),
+    )
+
+    def merge_items(cur_items: Dict[str, Any], ref_items: Dict[str, Any], level: int) -> Dict[str, Any]:
+        # Build one diff level as the union of current and reference items.
+        # Every node is a fresh shallow copy created with its final metric and
+        # metric_diff values, so neither input map is modified and no full deep
+        # copy with a follow-up fix-up pass over the whole tree is needed.
+        children_key, metrics = levels[level]
+        merged: Dict[str, Any] = {}
+        ref_items_get = ref_items.get
+
+        for name, cur_info in cur_items.items():
+            ref_info = ref_items_get(name)
+            info = cur_info.copy()
+            for metric, metric_diff in metrics:
+                if ref_info is not None:
+                    info[metric_diff] = cur_info[metric] - ref_info[metric]
+                else:
+                    info[metric_diff] = cur_info[metric]
+            if children_key is not None:
+                info[children_key] = merge_items(cur_info[children_key],
+                                                 ref_info[children_key] if ref_info is not None else {},
+                                                 level + 1)
+            merged[name] = info
+
+        for name, ref_info in ref_items.items():
+            if name in merged:
+                continue
+            # Only present in the reference map, so its current size is zero.
+            info = ref_info.copy()
+            for metric, metric_diff in metrics:
+                info[metric] = 0
+                info[metric_diff] = 0 - ref_info[metric]
+            if children_key is not None:
+                info[children_key] = merge_items({}, ref_info[children_key], level + 1)
+            merged[name] = info
+
+        return merged
+
+    memory_map_diff = memory_map_cur.copy()
     memory_map_diff['target_diff'] = memory_map_ref['target']
     memory_map_diff['project_path_diff'] = memory_map_ref['project_path']
     memory_map_diff['image_size_diff'] = memory_map_cur['image_size'] - memory_map_ref['image_size']
-
-    for mem_type_name_ref, mem_type_info_ref in memory_map_ref['memory_types'].items():
-        if mem_type_name_ref not in memory_map_diff['memory_types']:
-            memory_map_diff['memory_types'][mem_type_name_ref] = copy.deepcopy(mem_type_info_ref)
-            continue
-
-        sections_diff = memory_map_diff['memory_types'][mem_type_name_ref]['sections']
-
-        for section_name_ref, section_info_ref in mem_type_info_ref['sections'].items():
-            if section_name_ref not in sections_diff:
-                sections_diff[section_name_ref] = copy.deepcopy(section_info_ref)
-                continue
-
-            archives_diff = sections_diff[section_name_ref]['archives']
-
-            for archive_name_ref, archive_info_ref in section_info_ref['archives'].items():
-                if archive_name_ref not in archives_diff:
-                    archives_diff[archive_name_ref] = copy.deepcopy(archive_info_ref)
-                    continue
-
-                object_files_diff = archives_diff[archive_name_ref]['object_files']
-
-                for object_file_name_ref, object_file_info_ref in archive_info_ref['object_files'].items():
-                    if object_file_name_ref not in object_files_diff:
-                        object_files_diff[object_file_name_ref] = copy.deepcopy(object_file_info_ref)
-                        continue
-
-                    symbols_diff = object_files_diff[object_file_name_ref]['symbols']
-
-                    for symbol_name_ref, symbol_info_ref in object_file_info_ref['symbols'].items():
-                        if symbol_name_ref not in symbols_diff:
-                            symbols_diff[symbol_name_ref] = copy.deepcopy(symbol_info_ref)
-                            continue
-
-    # Fix sizes for items in ref, but not in cur and calculate diff sizes
-    for mem_type_name_diff, mem_type_info_diff in memory_map_diff['memory_types'].items():
-        mem_type_info_cur = memory_map_cur['memory_types'].get(mem_type_name_diff, {})
-        mem_type_info_ref = memory_map_ref['memory_types'].get(mem_type_name_diff, {})
-        if mem_type_info_cur and mem_type_info_ref:
-            mem_type_info_diff['size_diff'] = mem_type_info_cur['size'] - mem_type_info_ref['size']
-            mem_type_info_diff['used_diff'] = mem_type_info_cur['used'] - mem_type_info_ref['used']
-        elif mem_type_info_cur:
-            mem_type_info_diff['size_diff'] = mem_type_info_cur['size']
-            mem_type_info_diff['used_diff'] = mem_type_info_cur['used']
-        else:
-            mem_type_info_diff['size'] = 0
-            mem_type_info_diff['used'] = 0
-            mem_type_info_diff['size_diff'] = 0 - mem_type_info_ref['size']
-            mem_type_info_diff['used_diff'] = 0 - mem_type_info_ref['used']
-
-        for section_name_diff, section_info_diff in mem_type_info_diff['sections'].items():
-            section_info_cur = mem_type_info_cur.get('sections', {}).get(section_name_diff, {})
-            section_info_ref = mem_type_info_ref.get('sections', {}).get(section_name_diff, {})
-            if section_info_cur and section_info_ref:
-                section_info_diff['size_diff'] = section_info_cur['size'] - section_info_ref['size']
-            elif section_info_cur:
-                section_info_diff['size_diff'] = section_info_cur['size']
-            else:
-                section_info_diff['size'] = 0
-                section_info_diff['size_diff'] = 0 - section_info_ref['size']
-
-            for archive_name_diff, archive_info_diff in section_info_diff['archives'].items():
-                archive_info_cur = section_info_cur.get('archives', {}).get(archive_name_diff, {})
-                archive_info_ref = section_info_ref.get('archives', {}).get(archive_name_diff, {})
-                if archive_info_cur and archive_info_ref:
-                    archive_info_diff['size_diff'] = archive_info_cur['size'] - archive_info_ref['size']
-                elif archive_info_cur:
-                    archive_info_diff['size_diff'] = archive_info_cur['size']
-                else:
-                    archive_info_diff['size'] = 0
-                    archive_info_diff['size_diff'] = 0 - archive_info_ref['size']
-
-                for obj_file_name_diff, obj_file_info_diff in archive_info_diff['object_files'].items():
-                    obj_file_info_cur = archive_info_cur.get('object_files', {}).get(obj_file_name_diff, {})
-                    obj_file_info_ref = archive_info_ref.get('object_files', {}).get(obj_file_name_diff, {})
-                    if obj_file_info_cur and obj_file_info_ref:
-                        obj_file_info_diff['size_diff'] = obj_file_info_cur['size'] - obj_file_info_ref['size']
-                    elif obj_file_info_cur:
-                        obj_file_info_diff['size_diff'] = obj_file_info_cur['size']
-                    else:
-                        obj_file_info_diff['size'] = 0
-                        obj_file_info_diff['size_diff'] = 0 - obj_file_info_ref['size']
-
-                    for symbol_name_diff, symbol_info_diff in obj_file_info_diff['symbols'].items():
-                        symbol_info_cur = obj_file_info_cur.get('symbols', {}).get(symbol_name_diff, {})
-                        symbol_info_ref = obj_file_info_ref.get('symbols', {}).get(symbol_name_diff, {})
-                        if symbol_info_cur and symbol_info_ref:
-                            symbol_info_diff['size_diff'] = symbol_info_cur['size'] - symbol_info_ref['size']
-                        elif symbol_info_cur:
-                            symbol_info_diff['size_diff'] = symbol_info_cur['size']
-                        else:
-                            symbol_info_diff['size'] = 0
-                            symbol_info_diff['size_diff'] = 0 - symbol_info_ref['size']
+    memory_map_diff['memory_types'] = merge_items(memory_map_cur['memory_types'],
+                                                  memory_map_ref['memory_types'], 0)
 
     log.debug(f'memory map diff', memory_map_diff)
     return memory_map_diff
@@ -432,13 +403,14 @@ def unify(memory_map: Dict[str, Any]) -> None:
 
     def unify_items(original: Dict[str, Any], unified: Dict[str, Any], level: str) -> None:
         # Generic function which unifies all memory map levels
+        sublevel = level_map[level]
+        unified_get = unified.get
         for original_item_name, original_item_info in original.items():
             original_item_name_abbrev = original_item_info['abbrev_name']
-            sublevel = level_map[level]
-            unified_item_info = unified.get(original_item_name_abbrev)
+            unified_item_info = unified_get(original_item_name_abbrev)
             if unified_item_info is None:
                 unified_item_info = {
-                    'abbrev_name': original_item_info['abbrev_name'],
+                    'abbrev_name': original_item_name_abbrev,
                     'size': original_item_info['size'],
                     'size_diff': original_item_info['size_diff'],
                     sublevel: {},
@@ -511,13 +483,20 @@ def walk(memory_map: Dict[str, Any], depth: str='all') -> Generator:
 
 
 def remove_unused(memory_map: Dict[str, Any]) -> None:
+    # Unused entries are deleted in place, same as in trim(), instead of
+    # rebuilding the dicts with comprehensions.
+    memory_types = memory_map['memory_types']
+
     # Remove memory types which are not used
-    memory_map['memory_types'] = {k: v for k, v in memory_map['memory_types'].items() if v['used']}
+    for k in [k for k, v in memory_types.items() if not v['used']]:
+        del memory_types[k]
 
     # Remove sections, which do not have any archive. For example .iram0.text_end is defined
     # to mark the end of IRAM code segment and contains just an alignment.
-    for mem_type_name, mem_type_info in memory_map['memory_types'].items():
-        mem_type_info['sections'] = {k: v for k, v in mem_type_info['sections'].items() if v['archives']}
+    for mem_type_info in memory_types.values():
+        sections = mem_type_info['sections']
+        for k in [k for k, v in sections.items() if not v['archives']]:
+            del sections[k]
 
 
 def trim(memory_map: Dict[str, Any], args: Namespace) -> None:
@@ -525,10 +504,9 @@ def trim(memory_map: Dict[str, Any], args: Namespace) -> None:
     dept of the tree if e.g. --archives is specified. It also removes all entries
     for the diff command if they were not changed."""
 
-    def changed(diff: int) -> bool:
-        if not args.diff or args.show_unchanged:
-            return True
-        return True if diff else False
+    # Evaluate once whether unchanged entries should be removed, instead of
+    # re-testing the args attributes for every node in the tree.
+    trim_unchanged = args.diff and not args.show_unchanged
 
     ARCHIVE_DETAILS, ARCHIVES, OBJECTS, ALL = range(4)
 
@@ -541,35 +519,51 @@ def trim(memory_map: Dict[str, Any], args: Namespace) -> None:
     else:
         depth = ALL
 
-    memory_map['memory_types'] = {k: v for k, v in memory_map['memory_types'].items()
-                                  if changed(v['used_diff'])}
+    if not trim_unchanged and depth == ALL:
+        # Nothing to remove and the full tree depth is requested.
+        return
 
-    for mem_type_name, mem_type_info in memory_map['memory_types'].items():
-        mem_type_info['sections'] = {k: v for k, v in mem_type_info['sections'].items()
-                                     if changed(v['size_diff'])}
+    # Filtered entries are deleted in place instead of rebuilding each dict with
+    # a comprehension, which would reallocate and rehash every kept entry.
+    memory_types = memory_map['memory_types']
+    if trim_unchanged:
+        for k in [k for k, v in memory_types.items() if not v['used_diff']]:
+            del memory_types[k]
 
-        for section_name, section_info in mem_type_info['sections'].items():
-            if depth == ARCHIVE_DETAILS:
-                section_info['archives'] = {k: v for k, v in section_info['archives'].items()
-                                            if v['abbrev_name'] == args.archive_details and
-                                            changed(v['size_diff'])}
-            else:
-                section_info['archives'] = {k: v for k, v in section_info['archives'].items()
-                                            if changed(v['size_diff'])}
+    for mem_type_name, mem_type_info in memory_types.items():
+        sections = mem_type_info['sections']
+        if trim_unchanged:
+            for k in [k for k, v in sections.items() if not v['size_diff']]:
+                del sections[k]
 
-            for archive_name, archive_info in section_info['archives'].items():
+        for section_name, section_info in sections.items():
+            archives = section_info['archives']
+            if depth == ARCHIVE_DETAILS:
+                for k in [k for k, v in archives.items()
+                          if v['abbrev_name'] != args.archive_details or
+                          (trim_unchanged and not v['size_diff'])]:
+                    del archives[k]
+            elif trim_unchanged:
+                for k in [k for k, v in archives.items() if not v['size_diff']]:
+                    del archives[k]
+
+            for archive_name, archive_info in archives.items():
                 if depth == ARCHIVES:
                     archive_info['object_files'] = {}
                     continue
-                archive_info['object_files'] = {k: v for k, v in archive_info['object_files'].items()
-                                                if changed(v['size_diff'])}
+                object_files = archive_info['object_files']
+                if trim_unchanged:
+                    for k in [k for k, v in object_files.items() if not v['size_diff']]:
+                        del object_files[k]
 
-                for object_name, object_info in archive_info['object_files'].items():
+                for object_name, object_info in object_files.items():
                     if depth == OBJECTS:
                         object_info['symbols'] = {}
                         continue
-                    object_info['symbols'] = {k: v for k, v in object_info['symbols'].items()
-                                              if changed(v['size_diff'])}
+                    symbols = object_info['symbols']
+                    if trim_unchanged:
+                        for k in [k for k, v in symbols.items() if not v['size_diff']]:
+                            del symbols[k]
 
 
 def sort(memory_map: Dict[str, Any], args: Namespace) -> None:
@@ -612,19 +606,39 @@ def _get_summary_memory_types(memory_map: Dict[str, Any]) -> Dict[str, Any]:
     return mem_types
 
 
+def _clone_summary_memory_types(mem_types: Dict[str, Any]) -> Dict[str, Any]:
+    # Helper cloning the memory type/section dictionary for every new summary
+    # entry. The structure shape is fixed, so it's rebuilt directly, which is
+    # much cheaper than a generic deep copy.
+    return {
+        mem_type_name: {
+            'size': 0,
+            'size_diff': 0,
+            'sections': {
+                section_name: {
+                    'size': 0,
+                    'size_diff': 0,
+                    'abbrev_name': section_info['abbrev_name'],
+                } for section_name, section_info in mem_type_info['sections'].items()
+            },
+        } for mem_type_name, mem_type_info in mem_types.items()
+    }
+
+
 def sort_dict_by_key(dictionary: Dict[str, Any], key: str, reverse: bool) -> Dict[str, Any]:
-        return {k: v for k, v in sorted(dictionary.items(),
-                                        key=lambda item: int(item[1][key]),
-                                        reverse=reverse)}
+    # Note that the int() conversion is not redundant: format_table also sorts
+    # by the float percentage columns through this helper and the truncation
+    # keeps rows with the same whole percent in their original stable order.
+    items = list(dictionary.items())
+    items.sort(key=lambda item: int(item[1][key]), reverse=reverse)
+    return dict(items)
 
 
 def get_summary_sorted(entries: Dict[str, Any], args: Namespace) -> Dict[str, Any]:
     sort_key = 'size_diff' if args.sort_diff else 'size'
     reverse = args.sort_reverse
 
-    entries = {k: v for k, v in sorted(entries.items(),
-                                       key=lambda item: int(item[1][sort_key]),
-                                       reverse=reverse)}
+    entries = sort_dict_by_key(entries, sort_key, reverse)
 
     for entry_name, entry_info in entries.items():
         entry_info['memory_types'] = sort_dict_by_key(entry_info['memory_types'], sort_key, reverse)
@@ -666,88 +680,97 @@ def rem_summary_unchanged(entries: Dict[str, Any], args: Namespace) -> Dict[str,
 
 
 def get_symbols_summary(memory_map: Dict[str, Any], args: Namespace) -> Dict[str, Any]:
-    symbols: Dict[str, Any] = {}
+    symbols: Dict[Any, Any] = {}
 
     mem_types = _get_summary_memory_types(memory_map)
     found = False
 
-    for (mem_type_name, mem_type_info,
-         section_name, section_info,
-         archive_name, archive_info,
-         object_file_name, object_file_info,
-         symbol_name, symbol_info) in walk(memory_map):
-
-        if archive_info['abbrev_name'] != args.archive_details:
-            continue
+    for mem_type_name, mem_type_info in memory_map['memory_types'].items():
+        for section_name, section_info in mem_type_info['sections'].items():
+            for archive_name, archive_info in section_info['archives'].items():
+                if archive_info['abbrev_name'] != args.archive_details:
+                    # Prune the whole archive subtree instead of visiting its symbols.
+                    continue
 
-        found = True
+                for object_file_name, object_file_info in archive_info['object_files'].items():
+                    for symbol_name, symbol_info in object_file_info['symbols'].items():
+                        found = True
 
-        symbol_name_full = ':'.join([archive_name, object_file_name, symbol_name])
-        if args.unify:
-            symbol_name_full = symbol_info['abbrev_name']
-        if symbol_name_full not in symbols:
-            symbol: Dict[str, Any] = {
-                'abbrev_name': symbol_name,
-                'size': 0,
-                'size_diff': 0,
-                'memory_types': copy.deepcopy(mem_types),
-            }
-            symbols[symbol_name_full] = symbol
-        else:
-            symbol = symbols[symbol_name_full]
+                        # Aggregate under a tuple key; hashing it is cheaper than
+                        # joining and hashing a composite string per visited symbol.
+                        # The keys are joined once per unique entry below.
+                        symbol_name_full = (archive_name, object_file_name, symbol_name)
+                        if args.unify:
+                            symbol_name_full = symbol_info['abbrev_name']
+                        if symbol_name_full not in symbols:
+                            symbol: Dict[str, Any] = {
+                                'abbrev_name': symbol_name,
+                                'size': 0,
+                                'size_diff': 0,
+                                'memory_types': _clone_summary_memory_types(mem_types),
+                            }
+                            symbols[symbol_name_full] = symbol
+                        else:
+                            symbol = symbols[symbol_name_full]
 
-        symbol_mem_type = symbol['memory_types'][mem_type_name]
-        size = symbol_info['size']
-        symbol_mem_type['sections'][section_name]['size'] = size
-        symbol_mem_type['size'] += size
-        symbol['size'] += size
+                        symbol_mem_type = symbol['memory_types'][mem_type_name]
+                        size = symbol_info['size']
+                        symbol_mem_type['sections'][section_name]['size'] = size
+                        symbol_mem_type['size'] += size
+                        symbol['size'] += size
 
-        size = symbol_info['size_diff']
-        symbol_mem_type['sections'][section_name]['size_diff'] = size
-        symbol_mem_type['size_diff'] += size
-        symbol['size_diff'] += size
+                        size = symbol_info['size_diff']
+                        symbol_mem_type['sections'][section_name]['size_diff'] = size
+                        symbol_mem_type['size_diff'] += size
+                        symbol['size_diff'] += size
 
     if not found:
         log.die(f'Archive "{args.archive_details}" not found.')
 
+    if not args.unify:
+        symbols = {':'.join(name): info for name, info in symbols.items()}
+
     return rem_summary_unchanged(symbols, args)
 
 
 def get_object_files_summary(memory_map: Dict[str, Any], args: Namespace) -> Dict[str, Any]:
-    object_files: Dict[str, Any] = {}
+    object_files: Dict[Any, Any] = {}
 
     mem_types = _get_summary_memory_types(memory_map)
 
-    for (mem_type_name, mem_type_info,
-         section_name, section_info,
-         archive_name, archive_info,
-         object_file_name, object_file_info,
-         _, _) in walk(memory_map, depth='objects'):
-
-        object_file_name_full = ':'.join([archive_name, object_file_name])
-        if args.unify:
-            object_file_name_full = object_file_info['abbrev_name']
-        if object_file_name_full not in object_files:
-            object_file: Dict[str, Any] = {
-                'abbrev_name': os.path.basename(object_file_name),
-                'size': 0,
-                'size_diff': 0,
-                'memory_types': copy.deepcopy(mem_types),
-            }
-            object_files[object_file_name_full] = object_file
-        else:
-            object_file = object_files[object_file_name_full]
+    for mem_type_name, mem_type_info in memory_map['memory_types'].items():
+        for section_name, section_info in mem_type_info['sections'].items():
+            for archive_name, archive_info in section_info['archives'].items():
+                for object_file_name, object_file_info in archive_info['object_files'].items():
 
-        object_file_mem_type = object_file['memory_types'][mem_type_name]
-        size = object_file_info['size']
-        object_file_mem_type['sections'][section_name]['size'] = size
-        object_file_mem_type['size'] += size
-        object_file['size'] += size
+                    # Tuple key joined once per unique entry below, see get_symbols_summary.
+                    object_file_name_full = (archive_name, object_file_name)
+                    if args.unify:
+                        object_file_name_full = object_file_info['abbrev_name']
+                    if object_file_name_full not in object_files:
+                        object_file: Dict[str, Any] = {
+                            'abbrev_name': os.path.basename(object_file_name),
+                            'size': 0,
+                            'size_diff': 0,
+                            'memory_types': _clone_summary_memory_types(mem_types),
+                        }
+                        object_files[object_file_name_full] = object_file
+                    else:
+                        object_file = object_files[object_file_name_full]
+
+                    object_file_mem_type = object_file['memory_types'][mem_type_name]
+                    size = object_file_info['size']
+                    object_file_mem_type['sections'][section_name]['size'] = size
+                    object_file_mem_type['size'] += size
+                    object_file['size'] += size
+
+                    size = object_file_info['size_diff']
+                    object_file_mem_type['sections'][section_name]['size_diff'] = size
+                    object_file_mem_type['size_diff'] += size
+                    object_file['size_diff'] += size
 
-        size = object_file_info['size_diff']
-        object_file_mem_type['sections'][section_name]['size_diff'] = size
-        object_file_mem_type['size_diff'] += size
-        object_file['size_diff'] += size
+    if not args.unify:
+        object_files = {':'.join(name): info for name, info in object_files.items()}
 
     return rem_summary_unchanged(object_files, args)
 
@@ -757,73 +780,74 @@ def get_archives_summary(memory_map: Dict[str, Any], args: Namespace) -> Dict[st
 
     mem_types = _get_summary_memory_types(memory_map)
 
-    for (mem_type_name, mem_type_info,
-         section_name, section_info,
-         archive_name, archive_info,
-         _, _,
-         _, _) in walk(memory_map, depth='archives'):
+    for mem_type_name, mem_type_info in memory_map['memory_types'].items():
+        for section_name, section_info in mem_type_info['sections'].items():
+            for archive_name, archive_info in section_info['archives'].items():
 
-        if archive_name not in archives:
-            archive: Dict[str, Any] = {
-                'abbrev_name': archive_info['abbrev_name'],
-                'size': 0,
-                'size_diff': 0,
-                'memory_types': copy.deepcopy(mem_types),
-            }
-            archives[archive_name] = archive
-        else:
-            archive = archives[archive_name]
+                if archive_name not in archives:
+                    archive: Dict[str, Any] = {
+                        'abbrev_name': archive_info['abbrev_name'],
+                        'size': 0,
+                        'size_diff': 0,
+                        'memory_types': _clone_summary_memory_types(mem_types),
+                    }
+                    archives[archive_name] = archive
+                else:
+                    archive = archives[archive_name]
 
-        archive_mem_type = archive['memory_types'][mem_type_name]
-        size = archive_info['size']
-        archive_mem_type['sections'][section_name]['size'] = size
-        archive_mem_type['size'] += size
-        archive['size'] += size
+                archive_mem_type = archive['memory_types'][mem_type_name]
+                size = archive_info['size']
+                archive_mem_type['sections'][section_name]['size'] = size
+                archive_mem_type['size'] += size
+                archive['size'] += size
 
-        size = archive_info['size_diff']
-        archive_mem_type['sections'][section_name]['size_diff'] = size
-        archive_mem_type['size_diff'] += size
-        archive['size_diff'] += size
+                size = archive_info['size_diff']
+                archive_mem_type['sections'][section_name]['size_diff'] = size
+                archive_mem_type['size_diff'] += size
+                archive['size_diff'] += size
 
     return rem_summary_unchanged(archives, args)
 
 
-def _filter_memory_regions(memory_regions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    memory_regions_filtered: List[Dict[str, Any]] = []
-
+def _filter_memory_regions(memory_regions: List[Dict[str, Any]]) -> Generator:
+    # The regions are yielded lazily, so the intermediate filtered list is never
+    # materialized; _split_memory_regions consumes the generator directly. The
+    # filtered regions are visible in the splitted regions debug output.
     for mem_reg in memory_regions:
         if mem_reg['name'] == '*default*':
             # Skip default memory region
             continue
-        memory_regions_filtered.append(mem_reg)
-
-    log.debug(f'memory regions filtered', memory_regions_filtered)
-    return memory_regions_filtered
+        yield mem_reg
 
 
-def _split_memory_regions(memory_regions: List[Dict[str, Any]], memory_types: Dict[str, Any]) -> List[Dict[str, Any]]:
+def _split_memory_regions(memory_regions: Iterable[Dict[str, Any]], memory_types: Dict[str, Any]) -> List[Dict[str, Any]]:
     # Split memory regions according to memory types and assign each memory region a memory type.
     memory_regions_splitted: List[Dict[str, Any]] = []
 
+    # Memory type address ranges do not overlap, so collect them into a list of
+    # intervals sorted by start address. Each memory region lookup is then a single
+    # binary search instead of a scan over all memory types.
+    intervals: List[Any] = []
+    for mem_type_info in memory_types.values():
+        mem_type_length = mem_type_info['length']
+        mem_type_addr = mem_type_info['primary_address']
+        intervals.append((mem_type_addr, mem_type_addr + mem_type_length, mem_type_info))
+        if mem_type_info['secondary_address']:
+            mem_type_addr = mem_type_info['secondary_address']
+            intervals.append((mem_type_addr, mem_type_addr + mem_type_length, mem_type_info))
+    intervals.sort(key=lambda interval: interval[0])
+    interval_starts = [interval[0] for interval in intervals]
+
     for mem_reg in memory_regions:
         mem_reg_length = mem_reg['length']
         mem_reg_origin = mem_reg['origin']
 
         while True:
-            for mem_type_name, mem_type_info in memory_types.items():
-                found = False
-                mem_type_addr = mem_type_info['primary_address']
-                mem_type_length = mem_type_info['length']
-                if mem_type_addr <= mem_reg_origin < mem_type_addr + mem_type_length:
-                    found = True
-                elif mem_type_info['secondary_address']:
-                    mem_type_addr = mem_type_info['secondary_address']
-                    if mem_type_addr <= mem_reg_origin < mem_type_addr + mem_type_length:
-                        found = True
-                if not found:
-                    continue
-
-                used_length = min(mem_reg_length, mem_type_length - (mem_reg_origin - mem_type_addr))
+            idx = bisect.bisect_right(interval_starts, mem_reg_origin) - 1
+            if idx >= 0 and mem_reg_origin < intervals[idx][1]:
+                interval_end = intervals[idx][1]
+                mem_type_info = intervals[idx][2]
+                used_length = min(mem_reg_length, interval_end - mem_reg_origin)
                 memory_regions_splitted.append({
                     'name': mem_reg['name'],
                     'origin': mem_reg_origin,
@@ -833,7 +857,6 @@ def _split_memory_regions(memory_regions: List[Dict[str, Any]], memory_types: Di
                 })
                 mem_reg_origin += used_length
                 mem_reg_length -= used_length
-                break
             else:
                 # No memory type found for memory region. Check if it's a zero size
                 # reserved region, which may have starting address at the end of
@@ -869,8 +892,10 @@ def _filter_map_sections(sections: List[Dict[str, Any]], elf_sections: Optional[
             # Remove empty sections.
             continue
 
-        if section['name'].endswith(('dummy', 'reserved_for_iram')):
-            # These are NOLOAD sections, which are used as a gap for overlapping memory
+        section_name = section['name']
+        if section_name.endswith(SKIP_SECTION_SUFFIXES):
+            # Sections ending with "dummy" or "reserved_for_iram" are NOLOAD sections,
+            # which are used as a gap for overlapping memory
             # regions. For example on esp32s3 SRAM1 may be accessed via instruction and
             # data bus. iram0_0_seg memory range covers SRAM0+SRAM1, while dram0_0_seg covers SRAM1, so
             # iram0_0_seg may overlap into dram0_0_seg. The dummy section is used to "move"
@@ -879,24 +904,20 @@ def _filter_map_sections(sections: List[Dict[str, Any]], elf_sections: Optional[
             # memory during process execution, like bss, but the same space is actually loaded
             # with data from other section in the iram0_0_seg. Hence we would account the
             # space twice.
-            continue
-
-        if section['name'].endswith('noload'):
-            # NOLOAD section used to dump data, which are not used during process
-            # execution. It's placed as last section in memory region. For example
-            # .flash.rodata_noload output section in drom0_0_seg(default_rodata_seg)
-            # memory region.
+            #
+            # Sections ending with "noload" are NOLOAD sections used to dump data, which
+            # are not used during process execution. It's placed as last section in memory
+            # region. For example .flash.rodata_noload output section in
+            # drom0_0_seg(default_rodata_seg) memory region.
             continue
 
         if elf_sections:
-            if section['name'] not in elf_sections:
+            if section_name not in elf_sections:
                 # Section does not occupy memory during process execution, no SHF_ALLOC flag.
                 continue
         else:
             # ELF sections are not available. Filter based on output section names.
-            if (not section['name'].endswith(('.text', '.data', '.bss', '.rodata', 'noinit', '.vectors')) and
-                    '.flash' not in section['name'] and
-                    '.eh_frame' not in section['name']):
+            if not RE_ALLOC_SECTION_NAME.search(section_name):
                 continue
 
         # Remove input sections, which have zero size
@@ -912,22 +933,32 @@ def _split_map_sections(sections: List[Dict[str, Any]], regions: List[Dict[str,
 
     sections = sections.copy()
 
+    # Memory regions do not overlap, so index them by origin once and locate the
+    # region containing a section start with binary search instead of scanning
+    # all regions for every section.
+    regions_sorted = sorted(regions, key=lambda region: region['origin'])
+    region_starts = [region['origin'] for region in regions_sorted]
+    # Precompute the region end addresses used several times per section below.
+    region_ends = [region['origin'] + region['length'] for region in regions_sorted]
+
     while sections:
         section = sections.pop()
-        for region in regions:
-            if section['address'] < region['origin'] or section['address'] >= region['origin'] + region['length']:
-                # Section is not part of this region
-                continue
-            if section['address'] + section['size'] <= region['origin'] + region['length']:
-                # Sections fits into the region
-                sections_splitted.append(section)
-                break
+        section_addr = section['address']
+        idx = bisect.bisect_right(region_starts, section_addr) - 1
+        region_end = region_ends[idx] if idx >= 0 else 0
+        if idx < 0 or section_addr >= region_end:
+            # Output section or its part does not fit into any memory region. Just add it as it is.
+            sections_splitted.append(section)
+        elif section_addr + section['size'] <= region_end:
+            # Sections fits into the region
+            sections_splitted.append(section)
+        else:
             # Section spans across multiple memory types, so split it according to the memory type.
-            split_addr = region['origin'] + region['length']
-            split_size = split_addr - section['address']
+            split_addr = region_end
+            split_size = split_addr - section_addr
             section1 = {
                 'name': section['name'],
-                'address': section['address'],
+                'address': section_addr,
                 'size': split_size,
                 'input_sections': [],
             }
@@ -938,11 +969,14 @@ def _split_map_sections(sections: List[Dict[str, Any]], regions: List[Dict[str,
                 'input_sections': [],
             }
             for input_section in section['input_sections']:
-                input_section_end = input_section['address'] + input_section['size'] + input_section['fill']
+                input_section_addr = input_section['address']
+                input_section_size = input_section['size']
+                input_section_fill = input_section['fill']
+                input_section_end = input_section_addr + input_section_size + input_section_fill
                 if input_section_end <= split_addr:
                     # Input section fully fits into new output section1
                     section1['input_sections'].append(input_section)
-                elif input_section['address'] > split_addr:
+                elif input_section_addr > split_addr:
                     # Input section fully fits into new output section2
                     section2['input_sections'].append(input_section)
                 else:
@@ -952,19 +986,23 @@ def _split_map_sections(sections: List[Dict[str, Any]], regions: List[Dict[str,
                     input_section2 = input_section.copy()
                     input_section2['symbols'] = []
 
-                    input_section1['size'] = min(split_addr - input_section['address'], input_section['size'])
-                    input_section1['fill'] = split_addr - (input_section1['address'] + input_section1['size'])
+                    input_section1_size = min(split_addr - input_section_addr, input_section_size)
+                    input_section1['size'] = input_section1_size
+                    input_section1_fill = split_addr - (input_section_addr + input_section1_size)
+                    input_section1['fill'] = input_section1_fill
                     input_section2['address'] = split_addr
-                    input_section2['size'] = input_section['size'] - input_section1['size']
-                    input_section2['fill'] = input_section['fill'] - input_section1['fill']
+                    input_section2['size'] = input_section_size - input_section1_size
+                    input_section2['fill'] = input_section_fill - input_section1_fill
 
                     # Split symbols
                     for symbol in input_section['symbols']:
-                        symbol_end_addr = symbol['address'] + symbol['size']
+                        symbol_addr = symbol['address']
+                        symbol_size = symbol['size']
+                        symbol_end_addr = symbol_addr + symbol_size
                         if symbol_end_addr <= split_addr:
                             # Symbol fully fits into new input section1
                             input_section1['symbols'].append(symbol)
-                        elif symbol['address'] > split_addr:
+                        elif symbol_addr > split_addr:
                             # Symbol fully fits into new input section2
                             input_section2['symbols'].append(symbol)
                         else:
@@ -972,9 +1010,10 @@ def _split_map_sections(sections: List[Dict[str, Any]], regions: List[Dict[str,
                             symbol1 = symbol.copy()
                             symbol2 = symbol.copy()
 
-                            symbol1['size'] = split_addr - symbol['address']
+                            symbol1_size = split_addr - symbol_addr
+                            symbol1['size'] = symbol1_size
                             symbol2['address'] = split_addr
-                            symbol2['size'] = symbol['size'] - symbol1['size']
+                            symbol2['size'] = symbol_size - symbol1_size
 
                             input_section1['symbols'].append(symbol1)
                             input_section2['symbols'].append(symbol2)
@@ -988,16 +1027,15 @@ def _split_map_sections(sections: List[Dict[str, Any]], regions: List[Dict[str,
             sections.append(section2)
             log.debug(f'linker map output section {section["name"]} splitted at address {split_addr}',
                       section, section1, section2)
-            break
-        else:
-            # Output section or its part does not fit into any memory region. Just add it as it is.
-            sections_splitted.append(section)
 
     log.debug(f'linker map output sections splitted', sections_splitted)
     return sections_splitted
 
 
+@functools.lru_cache(maxsize=None)
 def _abbrev(section_name: str) -> str:
+    # Section names repeat across split sections and maps, so the abbreviated
+    # form is cached.
     splitted = section_name.split('.')
     return f'.{splitted[-1]}'
 
@@ -1013,7 +1051,12 @@ def _load_json_file(fn: str) -> Optional[Dict[str, Any]]:
     return data
 
 
+@functools.lru_cache(maxsize=8)
 def _load_elf_file(fn: str) -> Optional[Elf]:
+    # Parsing the ELF headers is not free, so keep a few recently loaded files
+    # around. This makes repeated get() calls against the same project, e.g.
+    # several summaries or a diff with itself, reuse the parsed instance. The
+    # Elf object is only read by the callers, so sharing it is safe.
     elf = None
     try:
         elf = Elf(fn)
@@ -1038,11 +1081,6 @@ def _add_symbols_to_sections(elf: Optional[Elf], osections: List[Dict[str, Any]]
                 }]
         return
 
-    # Get dictionary of symbols from ELF for STT_FUNC and STT_OBJECT and sort it based
-    # on symbol address.
-    symbols: List[Elf_Sym] = [s for s in sorted(elf.symbols, key=lambda s: s.st_value or 0)
-                              if s.type in (STT_FUNC, STT_OBJECT) and s.st_size]  # or 0 help mypy
-
     # Get list of input sections, sorted by address, and add symbols list to each
     # input section.
     isections: List[Dict[str, Any]] = []
@@ -1053,38 +1091,58 @@ def _add_symbols_to_sections(elf: Optional[Elf], osections: List[Dict[str, Any]]
 
     isections = [s for s in sorted(isections, key=lambda s: s.get('address', 0))]  # s.get used to help mypy
 
-    # Add ELF symbols into input sections
-    isec = isections.pop(0)
-    for symbol in symbols:
+    isec_ends = [isec['address'] + isec['size'] for isec in isections]
+    isec_lo = isections[0]['address'] if isections else 0
+    isec_hi = isec_ends[-1] if isec_ends else 0
+
+    # Get list of symbols from ELF for STT_FUNC and STT_OBJECT, which lie within
+    # the input sections address range, and sort it based on symbol address.
+    # Filtering before the sort keeps the ROM-mapped and other out-of-range
+    # symbols, often a large fraction, out of the sort input.
+    # Each entry carries the STT_FUNC flag resolved during filtering, so the
+    # assignment loop below does not have to decode st_info again.
+    symbols: List[Tuple[bool, Elf_Sym]] = []
+    overflow_symbol: Optional[Elf_Sym] = None
+    for s in elf.symbols:
+        s_type = s.type
+        if s_type not in (STT_FUNC, STT_OBJECT) or not s.st_size:
+            continue
+        if s.st_value < isec_lo:
+            # Below the first input section; skipped as ROM mapped unless it
+            # crosses the first input section end, which fails the fit check.
+            if s.st_value + s.st_size > isec_ends[0]:
+                isec = isections[0]
+                raise MemMapException((f'symbol name: {s.name}, addr: {s.st_value}, size: {s.st_size} '
+                                       f'does not fit into input section name: {isec["name"]}, '
+                                       f'addr: {isec["address"]}, size: {isec["size"]}'))
+            continue
+        if s.st_value >= isec_hi:
+            # Above the last input section end; remember the lowest such symbol
+            # for the sanity check below.
+            if overflow_symbol is None or s.st_value < overflow_symbol.st_value:
+                overflow_symbol = s
+            continue
+        symbols.append((s_type == STT_FUNC, s))
+
+    if overflow_symbol is not None:
+        # Sanity check that we found input section for symbol
+        raise MemMapException(f'cannot find input section for symbol '
+                              f'{overflow_symbol.name}({overflow_symbol.st_value})')
+
+    symbols.sort(key=lambda entry: entry[1].st_value)
+
+    # Add ELF symbols into input sections. The input section covering a symbol
+    # is located with binary search over the sorted input section end addresses,
+    # which is the position where a cursor advancing through the sorted sections
+    # would stop for the sorted symbol addresses.
+    idx = 0
+
+    for is_func, symbol in symbols:
         sym_name = symbol.name
         sym_addr = symbol.st_value
         sym_size = symbol.st_size
-        while sym_addr >= isec['address'] + isec['size']:
-            if not isections:
-                # Sanity check that we found input section for symbol
-                raise MemMapException(f'cannot find input section for symbol {sym_name}({sym_addr})')
-
-            if not isec['symbols']:
-                # Input section does not have any ELF symbols assigned.
-                # In e.g. .data or .rodata sections, there might be literals, which do not have symbols
-                # in symbol table. Since the binary is compiled with -fdata-sections, let's add the input
-                # section as "symbol". This should avoid displaying "holes" in the reports. Generally it's
-                # still possible that some libraries/objects, which are e.g. not compiled with -fdata-sections,
-                # may still be missing some "symbols". For example libc.a->lib_a-vfprintf.o: 657 != 117
-                # lib_a-vfprintf.o 657
-                # ├── blanks.1 16
-                # ├── zeroes.0 16
-                # ├── .rodata.str1.4 53
-                # └── .srodata.cst8 32
-                isec['symbols'].append({
-                    'name': isec['name'],
-                    'address': isec['address'],
-                    'size': isec['size'],
-                })
-
-            # Jump to next input section
-            isec = isections.pop(0)
-
+        idx = bisect.bisect_right(isec_ends, sym_addr)
+        isec = isections[idx]
         if sym_addr + sym_size > isec['address'] + isec['size']:
             # Sanity check that symbol fits into input section
             raise MemMapException((f'symbol name: {sym_name}, addr: {sym_addr}, size: {sym_size} '
@@ -1097,7 +1155,7 @@ def _add_symbols_to_sections(elf: Optional[Elf], osections: List[Dict[str, Any]]
             continue
 
         # Append '()' to function symbol
-        if symbol.type == STT_FUNC:
+        if is_func:
             sym_name += '()'
 
         isec['symbols'].append({
@@ -1106,6 +1164,26 @@ def _add_symbols_to_sections(elf: Optional[Elf], osections: List[Dict[str, Any]]
             'size': sym_size,
         })
 
+    # Input sections below the highest symbol address which did not get any ELF
+    # symbol assigned.
+    # In e.g. .data or .rodata sections, there might be literals, which do not have symbols
+    # in symbol table. Since the binary is compiled with -fdata-sections, let's add the input
+    # section as "symbol". This should avoid displaying "holes" in the reports. Generally it's
+    # still possible that some libraries/objects, which are e.g. not compiled with -fdata-sections,
+    # may still be missing some "symbols". For example libc.a->lib_a-vfprintf.o: 657 != 117
+    # lib_a-vfprintf.o 657
+    # ├── blanks.1 16
+    # ├── zeroes.0 16
+    # ├── .rodata.str1.4 53
+    # └── .srodata.cst8 32
+    for isec in isections[:idx]:
+        if not isec['symbols']:
+            isec['symbols'].append({
+                'name': isec['name'],
+                'address': isec['address'],
+                'size': isec['size'],
+            })
+
     log.debug(f'linker map output sections filtered with symbols', osections)
 
 
@@ -1140,7 +1218,7 @@ def _get_image_size(elf_sections: Optional[Dict[str, Elf_Shdr]], sections: List[
             size += sec['size']
         return size
 
-    for name, info in elf_sections.items():
+    for info in elf_sections.values():
         if info.sh_type != SHT_PROGBITS:
             continue
         size += info.sh_size
@@ -1149,34 +1227,41 @@ def _get_image_size(elf_sections: Optional[Dict[str, Elf_Shdr]], sections: List[
 
 
 def _add_archives_to_sections(sections: List[Dict[str, Any]]) -> None:
+    # Archive and object file paths repeat for many input sections, so their
+    # basenames are memoized instead of being re-parsed on every occurrence.
+    basenames: Dict[str, str] = {}
+
+    def basename(path: str) -> str:
+        abbrev_name = basenames.get(path)
+        if abbrev_name is None:
+            abbrev_name = basenames[path] = os.path.basename(path)
+        return abbrev_name
+
     for section in sections:
         archives: Dict[str, Any] = {}
         for input_section in section['input_sections']:
             archive_name = input_section['archive']
-            if archive_name not in archives:
-                archive = {
-                    'abbrev_name': os.path.basename(archive_name),
+            archive = archives.get(archive_name)
+            if archive is None:
+                archive = archives[archive_name] = {
+                    'abbrev_name': basename(archive_name),
                     'size': 0,
                     'size_diff': 0,
                     'object_files': {},
                 }
-                archives[archive_name] = archive
-            else:
-                archive = archives[archive_name]
 
             archive['size'] += input_section['size']
 
+            object_files = archive['object_files']
             object_file_name = input_section['object_file']
-            if object_file_name not in archive['object_files']:
-                object_file = {
-                    'abbrev_name': os.path.basename(object_file_name),
+            object_file = object_files.get(object_file_name)
+            if object_file is None:
+                object_file = object_files[object_file_name] = {
+                    'abbrev_name': basename(object_file_name),
                     'size': 0,
                     'size_diff': 0,
                     'symbols': {},
                 }
-                archive['object_files'][object_file_name] = object_file
-            else:
-                object_file = archive['object_files'][object_file_name]
 
             object_file['size'] += input_section['size']
 
@@ -1343,22 +1428,48 @@ def _expand_input_sections(map_file: mapfile.MapFile, proj_desc: Optional[Dict[s
     log.debug(f'linker map output sections expanded', map_file.sections)
 
 
+def _parse_chip_info_int(value: Any) -> int:
+    # Chip info YAML values are plain ints or simple arithmetic expressions,
+    # e.g. "17 * 0x2000 + 4 * 0x8000". Evaluate them with a small ast walker
+    # restricted to integer literals and +, - and *, instead of handing the
+    # file content to eval().
+    if isinstance(value, int):
+        return value
+
+    def evaluate(node: ast.AST) -> int:
+        if isinstance(node, ast.Constant) and isinstance(node.value, int):
+            return node.value
+        if isinstance(node, ast.BinOp):
+            if isinstance(node.op, ast.Add):
+                return evaluate(node.left) + evaluate(node.right)
+            if isinstance(node.op, ast.Sub):
+                return evaluate(node.left) - evaluate(node.right)
+            if isinstance(node.op, ast.Mult):
+                return evaluate(node.left) * evaluate(node.right)
+        raise ValueError(f'cannot evaluate chip info value "{value}"')
+
+    return evaluate(ast.parse(str(value), mode='eval').body)
+
+
+@functools.lru_cache(maxsize=None)
 def _get_memory_types(target: str) -> Dict[str, Any]:
-    # Load memory types from yml file
+    # Load memory types from yml file. The result is cached, because get() may be
+    # called several times for the same target, e.g. when diffing two maps. Callers
+    # only read the returned memory type info, so sharing one instance is safe.
     memory_types: Dict[str, Any] = {}
     try:
         directory = os.path.dirname(__file__)
         fn = os.path.join(directory, '..', 'chip_info', target + '.yaml')
         with open(fn, 'r') as f:
-            memory_types = yaml.safe_load(f)
+            memory_types = yaml.load(f, Loader=_YamlSafeLoader)
     except (OSError, ValueError) as e:
         raise MemMapException(f'cannot read memory types file: {e}')
 
     for name, info in memory_types.items():
-        info['primary_address'] = eval(str(info['primary_address']))
-        info['length'] = eval(str(info['length']))
+        info['primary_address'] = _parse_chip_info_int(info['primary_address'])
+        info['length'] = _parse_chip_info_int(info['length'])
         if 'secondary_address' in info:
-            info['secondary_address'] = eval(str(info['secondary_address']))
+            info['secondary_address'] = _parse_chip_info_int(info['secondary_address'])
         else:
             info['secondary_address'] = 0
 
@@ -1423,59 +1534,72 @@ def _get_mem_type_map(memory_types: Dict[str, Any],
                 memory_map[mem_type_alias]['size'] += mem_reg['length']
                 memory_types_regions[mem_type_alias].append(mem_reg)
 
-    # Add linker output sections into memory types.
+    # Add linker output sections into memory types. The memory region containing
+    # a section is located with binary search over the region origins instead of
+    # scanning all regions for every section.
     memory_regions_sorted = [r for r in sorted(memory_regions, key=lambda r: r['origin'] or 0)]
+    memory_regions_cnt = len(memory_regions_sorted)
+    memory_regions_origins = [r['origin'] or 0 for r in memory_regions_sorted]
     for map_section in map_sections:
+        idx = bisect.bisect_right(memory_regions_origins, map_section['address']) - 1
         prev_mem_reg = None
-        for mem_reg in memory_regions_sorted:
+        if idx >= 0:
+            mem_reg = memory_regions_sorted[idx]
             address = mem_reg['origin']
-            mem_type_alias = mem_reg['type']['name']
-            if address <= map_section['address'] < address + mem_reg['length']:
+            if map_section['address'] < address + mem_reg['length']:
+                mem_type_alias = mem_reg['type']['name']
                 if map_section['address'] + map_section['size'] > address + mem_reg['length']:
                     # Sanity check that output sections fits into memory region. This should probably never happen.
                     log.warn((f'output section {map_section["name"]}(addr: {map_section["address"]}, '
                               f'size: {map_section["size"]}) exceeds memory region "{mem_reg["name"]}" '
                               f'(addr: {address}, size: {mem_reg["length"]})'))
 
-                memory_map[mem_type_alias]['used'] += map_section['size']
-                memory_map[mem_type_alias]['sections'][map_section['name']] = {
+                mem_type_info = memory_map[mem_type_alias]
+                mem_type_info['used'] += map_section['size']
+                mem_type_info['sections'][map_section['name']] = {
                     'abbrev_name': map_section['abbrev_name'],
                     'size': map_section['size'],
                     'size_diff': 0,
                     'archives': map_section['archives'],
                 }
-                break
-            elif address > map_section['address'] and prev_mem_reg:
-                mem_type_alias = prev_mem_reg['type']['name']
-
-                # Output section does not map into any memory region. This may happen e.g. when memory region
-                # is not big enough and the linker fails. In this case try to map the output section into the
-                # first memory region/type preceding the output section.
-                log.warn((f'[red]{mem_type_alias} overflow detected![/red]: '
-                          f'output section or its part {map_section["name"]}(addr: {map_section["address"]}, '
-                          f'size: {map_section["size"]}) does not fit into any memory region and '
-                          f'will be assigned to the preceding {prev_mem_reg["name"]} memory region'))
-
-                # During overflow the output section could be split according to memory region, which
-                # is smaller than the output section. Meaning there will be to output section with the
-                # same name. One which was split and fully fits into the memory region and second which
-                # represents the overflow part. Since we could be mapping the overflow part into the same
-                # region, which may already contain the first part, we would overwrite it, because the
-                # output section names are used as key in the memory map dictionary. To overcome this and
-                # clearly mark the overflow part of the output memory section, append "_overflow" to its name.
-                map_section_name = map_section['name'] + '_overflow'
-
-                memory_map[mem_type_alias]['used'] += map_section['size']
-                memory_map[mem_type_alias]['sections'][map_section_name] = {
-                    'abbrev_name': _abbrev(map_section_name),
-                    'size': map_section['size'],
-                    'size_diff': 0,
-                    'archives': map_section['archives'],
-                }
-                break
-
-            prev_mem_reg = mem_reg
-
+                continue
+            if idx + 1 < memory_regions_cnt:
+                # The section lies in a gap before the next memory region; the last
+                # region starting below the section is the preceding one.
+                prev_mem_reg = mem_reg
+        elif memory_regions_cnt >= 2:
+            # All memory regions start above the section; treat the first region
+            # as the preceding one, same as the previous linear scan did.
+            prev_mem_reg = memory_regions_sorted[0]
+
+        if prev_mem_reg:
+            mem_type_alias = prev_mem_reg['type']['name']
+
+            # Output section does not map into any memory region. This may happen e.g. when memory region
+            # is not big enough and the linker fails. In this case try to map the output section into the
+            # first memory region/type preceding the output section.
+            log.warn((f'[red]{mem_type_alias} overflow detected![/red]: '
+                      f'output section or its part {map_section["name"]}(addr: {map_section["address"]}, '
+                      f'size: {map_section["size"]}) does not fit into any memory region and '
+                      f'will be assigned to the preceding {prev_mem_reg["name"]} memory region'))
+
+            # During overflow the output section could be split according to memory region, which
+            # is smaller than the output section. Meaning there will be to output section with the
+            # same name. One which was split and fully fits into the memory region and second which
+            # represents the overflow part. Since we could be mapping the overflow part into the same
+            # region, which may already contain the first part, we would overwrite it, because the
+            # output section names are used as key in the memory map dictionary. To overcome this and
+            # clearly mark the overflow part of the output memory section, append "_overflow" to its name.
+            map_section_name = map_section['name'] + '_overflow'
+
+            mem_type_info = memory_map[mem_type_alias]
+            mem_type_info['used'] += map_section['size']
+            mem_type_info['sections'][map_section_name] = {
+                'abbrev_name': _abbrev(map_section_name),
+                'size': map_section['size'],
+                'size_diff': 0,
+                'archives': map_section['archives'],
+            }
         else:
             log.warn((f'cannot assign output section {map_section["name"]}(addr: {map_section["address"]}, '
                       f'size: {map_section["size"]}) to any memory type'))